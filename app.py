@@ -3,6 +3,8 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from data_analyzer import DataAnalyzer
+from data_quality import DataQualityError, load_file, check_quality
+from date_parser import parse_dates
 
 # Configuration de la page
 st.set_page_config(
@@ -259,22 +261,23 @@ def main():
     
     if uploaded_file is not None:
         try:
-            # Charger les données
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
-            
-            # Vérifier les colonnes requises
-            required_columns = ['date', 'client_id', 'montant', 'statut']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                st.error(f" Colonnes manquantes : {', '.join(missing_columns)}")
+            # Valider un échantillon puis charger les données
+            try:
+                df = load_file(uploaded_file)
+            except DataQualityError as e:
+                st.error(f" Fichier rejeté : {str(e)}")
                 st.stop()
             
             st.success(f" Fichier chargé avec succès ! **{len(df)} lignes** détectées")
             
+            # Convertir les dates une seule fois (réutilisées par l'analyseur)
+            dates = parse_dates(df['date'])
+            
+            # Rapport de qualité des données
+            qualite = check_quality(df, dates=dates)
+            df['date'] = dates
+            show_quality_report(qualite)
+            
             # Étape 2: Questions de contexte
             st.markdown("---")
             st.markdown("Étape 2 : Personnalisez votre analyse")
@@ -294,15 +297,17 @@ def main():
                 )
             
             with col3:
-                # Détecter automatiquement la période
-                df_temp = df.copy()
-                df_temp['date'] = pd.to_datetime(df_temp['date'])
-                date_min = df_temp['date'].min().strftime('%m/%Y')
-                date_max = df_temp['date'].max().strftime('%m/%Y')
+                # Détecter automatiquement la période (lignes valides uniquement,
+                # comme l'analyse : une date en 2099 ne l'étire pas)
+                dates_valides = dates[qualite['lignes_valides']]
+                if dates_valides.notna().any():
+                    periode = f"{dates_valides.min():%m/%Y} - {dates_valides.max():%m/%Y}"
+                else:
+                    periode = "Aucune date valide"
                 
                 st.text_input(
                     "Période analysée",
-                    value=f"{date_min} - {date_max}",
+                    value=periode,
                     disabled=True
                 )
             
@@ -313,11 +318,17 @@ def main():
                 st.session_state.df = df
                 st.session_state.activite = activite
                 st.session_state.objectif = objectif
+                st.session_state.qualite = qualite
                 st.rerun()
             
             # Afficher les résultats si analysé
             if st.session_state.analyzed and 'df' in st.session_state:
-                show_results(st.session_state.df, st.session_state.activite, st.session_state.objectif)
+                show_results(
+                    st.session_state.df,
+                    st.session_state.activite,
+                    st.session_state.objectif,
+                    st.session_state.get('qualite')
+                )
                 
         except Exception as e:
             st.error(f" Erreur lors du chargement du fichier : {str(e)}")
@@ -351,7 +362,32 @@ date,client_id,montant,statut
         </div>
     """, unsafe_allow_html=True)
 
-def show_results(df, activite, objectif):
+def show_quality_report(qualite):
+    """Affiche le rapport de qualité des données"""
+    
+    titre = f" Qualité des données : {qualite['taux_lignes_valides']:.1f}% de lignes valides"
+    
+    with st.expander(titre, expanded=qualite['nb_lignes_invalides'] > 0):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("**Valeurs manquantes**")
+            for col, n in qualite['valeurs_manquantes'].items():
+                st.write(f"• {col} : **{n}**")
+        
+        with col2:
+            st.markdown("**Anomalies détectées**")
+            st.write(f"• Dates illisibles : **{qualite['dates_invalides']}**")
+            st.write(f"• Dates hors plage : **{qualite['dates_hors_plage']}**")
+            st.write(f"• Montants non numériques : **{qualite['montants_non_numeriques']}**")
+            st.write(f"• Montants négatifs : **{qualite['montants_negatifs']}**")
+            st.write(f"• Transactions en double : **{qualite['doublons']}**")
+            st.write(f"• Statuts inconnus : **{qualite['statuts_inconnus']}**")
+        
+        if qualite['nb_lignes_invalides'] > 0:
+            st.warning(f" {qualite['nb_lignes_invalides']} lignes présentent des anomalies : vérifiez votre fichier source")
+
+def show_results(df, activite, objectif, qualite=None):
     """Affiche les résultats de l'analyse"""
     
     st.markdown("---")
@@ -359,11 +395,13 @@ def show_results(df, activite, objectif):
     
     # Créer l'analyseur
     with st.spinner(" Analyse en cours..."):
-        analyzer = DataAnalyzer(df)
+        # Le masque du rapport qualité évite de reprofiler les données
+        lignes_valides = qualite['lignes_valides'] if qualite else None
+        analyzer = DataAnalyzer(df, lignes_valides)
         kpis = analyzer.get_kpis()
         alerts = analyzer.detect_alerts(kpis)
         recommendations = analyzer.get_recommendations(kpis, alerts)
-        score, statut = analyzer.get_health_score(kpis)
+        score, statut = analyzer.get_health_score(kpis, qualite)
     
     # Score de santé global
     st.markdown(" Santé Globale de votre Activité")
@@ -478,6 +516,61 @@ def show_results(df, activite, objectif):
         )
         st.plotly_chart(fig, use_container_width=True)
     
+    # Concentration du CA
+    st.markdown("---")
+    st.markdown(" Concentration du Chiffre d'Affaires")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Courbe de Lorenz
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=kpis['lorenz']['part_clients'],
+            y=kpis['lorenz']['part_ca'],
+            mode='lines',
+            name='Courbe de Lorenz',
+            line=dict(color='#667eea', width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=[0, 100],
+            y=[0, 100],
+            mode='lines',
+            name='Égalité parfaite',
+            line=dict(color='#764ba2', dash='dash')
+        ))
+        fig.update_layout(
+            title=f"Courbe de Lorenz (Gini : {kpis['gini']:.2f})",
+            xaxis_title="% des clients (du plus petit au plus gros)",
+            yaxis_title="% du CA cumulé",
+            font={'family': 'Inter'},
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        # Part du CA des meilleurs clients
+        parts_top_df = pd.DataFrame({
+            'Top clients': [f"Top {pct}%" for pct in kpis['parts_top']],
+            'Part du CA': list(kpis['parts_top'].values())
+        })
+        
+        fig = px.bar(
+            parts_top_df,
+            x='Top clients',
+            y='Part du CA',
+            title='Part du CA générée par les meilleurs clients',
+            labels={'Part du CA': 'Part du CA (%)'}
+        )
+        fig.update_traces(marker_color='#667eea')
+        fig.update_layout(
+            font={'family': 'Inter'},
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
     # Alertes
     st.markdown("---")
     st.markdown("  Alertes et Opportunités")
@@ -536,6 +629,7 @@ def show_results(df, activite, objectif):
         st.write(f"• Nombre total de transactions : **{kpis['nb_transactions']}**")
         st.write(f"• Fréquence d'achat moyenne : **{kpis['freq_achat_moyenne']:.2f}**")
         st.write(f"• Concentration du CA (top 20%) : **{kpis['concentration_ca']:.1f}%**")
+        st.write(f"• Indice de Gini du CA : **{kpis['gini']:.2f}**")
     
     with col2:
         st.markdown("**Période d'analyse**")
@@ -0,0 +1,61 @@
+import pandas as pd
+import numpy as np
+
+# Parts de clients (en %) pour lesquelles on mesure la part du CA
+TOP_CUTOFFS = (1, 5, 10, 20, 50)
+
+# Nombre de points de la courbe de Lorenz affichée
+LORENZ_POINTS_UI = 101
+
+
+def compute_concentration(ca_par_client, cutoffs=TOP_CUTOFFS, ui_points=LORENZ_POINTS_UI):
+    """
+    Mesure la concentration du CA entre clients
+
+    Les montants sont triés une fois en tableau numpy brut (sans l'index
+    pandas), puis une seule somme cumulée donne le CA des m plus petits
+    clients pour tous les rangs : parts du top, courbe de Lorenz et Gini
+    sont lus sur ce même tableau.
+
+    Args:
+        ca_par_client: Series (ou tableau) du CA par client
+        cutoffs: Pourcentages de meilleurs clients à mesurer
+        ui_points: Nombre de points de la courbe renvoyée pour l'affichage
+
+    Returns:
+        dict: parts_top (pct -> % du CA), gini, lorenz (DataFrame)
+    """
+    values = np.sort(np.asarray(ca_par_client, dtype=float))
+    n = len(values)
+    total = values.sum()
+
+    if n == 0 or total == 0:
+        return {
+            'parts_top': {pct: 0.0 for pct in cutoffs},
+            'gini': 0.0,
+            'lorenz': pd.DataFrame({'part_clients': [0.0, 100.0], 'part_ca': [0.0, 100.0]})
+        }
+
+    # CA cumulé des m plus petits clients, pour m de 0 à n
+    cumul = np.concatenate([[0.0], np.cumsum(values)])
+
+    # Part du CA des k% meilleurs clients (au moins un client)
+    parts_top = {}
+    for pct in cutoffs:
+        nb_top = max(1, int(n * pct / 100))
+        parts_top[pct] = (total - cumul[n - nb_top]) / total * 100
+
+    # Gini exact : 1 - 2 * aire sous la courbe de Lorenz (trapèzes)
+    gini = 1 - (2 * cumul[1:-1].sum() + total) / (n * total)
+
+    # Courbe de Lorenz sous-échantillonnée pour l'affichage
+    ranks = np.unique(np.linspace(0, n, min(n, ui_points - 1) + 1).round().astype(np.int64))
+
+    return {
+        'parts_top': parts_top,
+        'gini': float(gini),
+        'lorenz': pd.DataFrame({
+            'part_clients': ranks / n * 100,
+            'part_ca': cumul[ranks] / total * 100
+        })
+    }
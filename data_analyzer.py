@@ -1,27 +1,52 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from date_parser import parse_dates
+from data_quality import normalize_statut, valid_rows_mask
+from concentration import compute_concentration
+from time_alerts import daily_totals, detect_anomalies
+
+# Période (en jours, avant la dernière transaction) sur laquelle les anomalies sont signalées
+PERIODE_RECENTE_JOURS = 30
+
+# Libellés des indicateurs suivis par les alertes
+LIBELLES_INDICATEURS = {
+    'ca': 'CA',
+    'nb_transactions': 'nombre de transactions',
+    'panier_moyen': 'panier moyen'
+}
 
 class DataAnalyzer:
     """Classe pour analyser les données business et générer des insights"""
     
-    def __init__(self, df):
+    def __init__(self, df, lignes_valides=None):
         """
         Initialise l'analyseur avec un DataFrame
         
         Args:
             df: DataFrame pandas avec colonnes [date, client_id, montant, statut]
+            lignes_valides: Masque des lignes exploitables calculé par
+                check_quality (recalculé si absent)
         """
         self.df = df.copy()
-        self._prepare_data()
+        self._prepare_data(lignes_valides)
         
-    def _prepare_data(self):
+    def _prepare_data(self, lignes_valides=None):
         """Prépare les données pour l'analyse"""
-        # Convertir la colonne date en datetime
-        self.df['date'] = pd.to_datetime(self.df['date'])
+        # Convertir la colonne date en datetime (sans effet si déjà convertie)
+        self.df['date'] = parse_dates(self.df['date'])
+        
+        # Écarter les lignes invalides du rapport qualité (dates hors plage,
+        # montants négatifs, doublons...), sans reprofiler si le masque est fourni
+        if lignes_valides is None:
+            lignes_valides = valid_rows_mask(self.df, dates=self.df['date'])
+        self.df = self.df[lignes_valides]
         
-        # Filtrer uniquement les transactions complètes
-        self.df = self.df[self.df['statut'] == 'complete'].copy()
+        # Convertir les montants en numérique
+        self.df['montant'] = pd.to_numeric(self.df['montant'], errors='coerce')
+        
+        # Filtrer uniquement les transactions complètes (statut normalisé)
+        self.df = self.df[normalize_statut(self.df['statut']) == 'complete'].copy()
         
         # Trier par date
         self.df = self.df.sort_values('date')
@@ -29,39 +54,72 @@ class DataAnalyzer:
         # Extraire mois et année
         self.df['mois'] = self.df['date'].dt.to_period('M')
         
+    def _aggregates(self):
+        """
+        Calcule les agrégats intermédiaires dont dérivent les KPIs
+        
+        Returns:
+            dict: achats_par_client, ca_par_client, ca_mensuel, nb_mensuel,
+                daily (CA et transactions par jour) et date_fin
+        """
+        par_client = self.df.groupby('client_id')['montant']
+        par_mois = self.df.groupby('mois')['montant']
+        
+        return {
+            'achats_par_client': par_client.size(),
+            'ca_par_client': par_client.sum(),
+            'ca_mensuel': par_mois.sum(),
+            'nb_mensuel': par_mois.size(),
+            'daily': daily_totals(self.df),
+            'date_fin': self.df['date'].max()
+        }
+    
     def get_kpis(self):
         """
         Calcule les KPIs principaux
         
+        Returns:
+            dict: Dictionnaire contenant tous les KPIs
+        """
+        return self._kpis_from_aggregates(self._aggregates())
+    
+    def _kpis_from_aggregates(self, agg):
+        """
+        Calcule les KPIs à partir des agrégats intermédiaires
+        
+        Args:
+            agg: Dictionnaire renvoyé par _aggregates
+            
         Returns:
             dict: Dictionnaire contenant tous les KPIs
         """
         kpis = {}
+        achats_par_client = agg['achats_par_client']
+        
         
         # 1. Chiffre d'affaires total
-        kpis['ca_total'] = self.df['montant'].sum()
+        kpis['ca_total'] = agg['daily']['ca'].sum()
         
         # 2. Nombre de transactions
-        kpis['nb_transactions'] = len(self.df)
+        kpis['nb_transactions'] = int(agg['daily']['nb_transactions'].sum())
         
         # 3. Panier moyen
-        kpis['panier_moyen'] = self.df['montant'].mean()
+        kpis['panier_moyen'] = kpis['ca_total'] / kpis['nb_transactions'] if kpis['nb_transactions'] else np.nan
         
         # 4. Nombre de clients uniques
-        kpis['nb_clients'] = self.df['client_id'].nunique()
+        kpis['nb_clients'] = len(achats_par_client)
         
         # 5. Fréquence d'achat moyenne
-        achats_par_client = self.df.groupby('client_id').size()
         kpis['freq_achat_moyenne'] = achats_par_client.mean()
         
         # 6. CA par mois
-        kpis['ca_mensuel'] = self.df.groupby('mois')['montant'].sum()
+        kpis['ca_mensuel'] = agg['ca_mensuel']
         
-        # 7. Évolution CA (dernier mois vs avant-dernier)
-        if len(kpis['ca_mensuel']) >= 2:
-            dernier_mois = kpis['ca_mensuel'].iloc[-1]
-            avant_dernier = kpis['ca_mensuel'].iloc[-2]
-            kpis['evolution_ca'] = ((dernier_mois - avant_dernier) / avant_dernier) * 100
+        # 7. Évolution CA (dernier mois vs même nombre de jours du mois précédent)
+        kpis['date_fin'] = agg['date_fin']
+        ca_dernier, nb_dernier, ca_avant, nb_avant = self._comparaison_mensuelle(agg['daily'], kpis['date_fin'])
+        if nb_dernier > 0 and nb_avant > 0:
+            kpis['evolution_ca'] = ((ca_dernier - ca_avant) / ca_avant) * 100
         else:
             kpis['evolution_ca'] = 0
             
@@ -69,26 +127,82 @@ class DataAnalyzer:
         clients_recurrents = (achats_par_client > 1).sum()
         kpis['taux_retention'] = (clients_recurrents / kpis['nb_clients']) * 100
         
-        # 9. Concentration du CA (part des top 20%)
-        ca_par_client = self.df.groupby('client_id')['montant'].sum().sort_values(ascending=False)
-        nb_top_clients = max(1, int(len(ca_par_client) * 0.2))
-        ca_top_clients = ca_par_client.head(nb_top_clients).sum()
-        kpis['concentration_ca'] = (ca_top_clients / kpis['ca_total']) * 100
-        
-        # 10. Évolution du panier moyen (2 derniers mois)
-        if len(kpis['ca_mensuel']) >= 2:
-            dernier_mois_dates = self.df[self.df['mois'] == self.df['mois'].iloc[-1]]
-            avant_dernier_mois_dates = self.df[self.df['mois'] == self.df['mois'].iloc[-2]]
-            
-            panier_dernier = dernier_mois_dates['montant'].mean()
-            panier_avant = avant_dernier_mois_dates['montant'].mean()
+        # 9. Concentration du CA (part des top 20%, Gini, courbe de Lorenz)
+        concentration = compute_concentration(agg['ca_par_client'])
+        kpis['concentration_ca'] = concentration['parts_top'][20]
+        kpis['parts_top'] = concentration['parts_top']
+        kpis['gini'] = concentration['gini']
+        kpis['lorenz'] = concentration['lorenz']
+        
+        # 10. Évolution du panier moyen (mêmes périodes que l'évolution du CA)
+        if nb_dernier > 0 and nb_avant > 0:
+            panier_dernier = ca_dernier / nb_dernier
+            panier_avant = ca_avant / nb_avant
             
             kpis['evolution_panier'] = ((panier_dernier - panier_avant) / panier_avant) * 100
         else:
             kpis['evolution_panier'] = 0
+        
+        # 11. Anomalies journalières et hebdomadaires (fenêtres glissantes)
+        kpis['anomalies'] = detect_anomalies(agg['daily'])
             
         return kpis
     
+    def _comparaison_mensuelle(self, daily, date_fin):
+        """
+        Totaux du dernier mois et du mois précédent sur le même nombre de jours
+        
+        Le mois de la dernière transaction est souvent incomplet : on le
+        compare aux mêmes jours (du 1er au jour de date_fin) du mois
+        calendaire précédent plutôt qu'au mois précédent entier.
+        
+        Args:
+            daily: Totaux journaliers (ca, nb_transactions) indexés par jour
+            date_fin: Date de la dernière transaction
+            
+        Returns:
+            tuple: (ca_dernier, nb_dernier, ca_avant, nb_avant)
+        """
+        if len(daily) == 0 or pd.isna(date_fin):
+            return 0.0, 0, 0.0, 0
+        
+        mois_fin = date_fin.to_period('M')
+        mois_avant = mois_fin - 1
+        nb_jours = date_fin.day
+        
+        debut_dernier = mois_fin.start_time
+        fin_dernier = date_fin.normalize() + pd.Timedelta(days=1)
+        debut_avant = mois_avant.start_time
+        fin_avant = debut_avant + pd.Timedelta(days=min(nb_jours, mois_avant.days_in_month))
+        
+        jours = daily.index
+        dernier = daily[(jours >= debut_dernier) & (jours < fin_dernier)]
+        avant = daily[(jours >= debut_avant) & (jours < fin_avant)]
+        
+        return (
+            dernier['ca'].sum(), int(dernier['nb_transactions'].sum()),
+            avant['ca'].sum(), int(avant['nb_transactions'].sum())
+        )
+    
+    def _describe_anomalie(self, anomalie):
+        """Formule une anomalie de série temporelle en texte lisible"""
+        libelle = LIBELLES_INDICATEURS[anomalie['indicateur']]
+        sens = "anormalement bas" if anomalie['zscore'] < 0 else "anormalement élevé"
+        
+        if anomalie['periode'] == 'jour':
+            quand = f"le {anomalie['date'].strftime('%d/%m/%Y')}"
+        else:
+            debut = anomalie['date'] - pd.Timedelta(days=6)
+            quand = f"la semaine du {debut.strftime('%d/%m/%Y')}"
+            if anomalie['indicateur'] != 'panier_moyen':
+                libelle = f"{libelle} moyen par jour"
+        
+        return (
+            f"{libelle[0].upper() + libelle[1:]} {sens} {quand} : "
+            f"{anomalie['valeur']:,.1f} contre {anomalie['moyenne']:,.1f} en moyenne glissante "
+            f"(z = {anomalie['zscore']:.1f})"
+        )
+    
     def detect_alerts(self, kpis):
         """
         Détecte les alertes et opportunités
@@ -105,18 +219,38 @@ class DataAnalyzer:
             'opportunites': []
         }
         
-        # Alerte 1: Baisse du CA
+        # Anomalies récentes (dernière occurrence par indicateur et par sens)
+        anomalies = kpis['anomalies']
+        debut_recent = kpis['date_fin'] - pd.Timedelta(days=PERIODE_RECENTE_JOURS)
+        recentes = anomalies[anomalies['date'] >= debut_recent]
+        baisses = recentes[recentes['zscore'] < 0].groupby('indicateur').tail(1)
+        hausses = recentes[recentes['zscore'] > 0].groupby('indicateur').tail(1)
+        
+        # Alerte 1: Baisse du CA (à période comparable sur le mois précédent)
         if kpis['evolution_ca'] < -10:
             alerts['critiques'].append({
                 'titre': ' Baisse significative du CA',
-                'description': f"Le CA a baissé de {abs(kpis['evolution_ca']):.1f}% sur le dernier mois"
+                'description': f"Le CA a baissé de {abs(kpis['evolution_ca']):.1f}% par rapport à la même période du mois précédent"
             })
         
-        # Alerte 2: Baisse du panier moyen
+        # Alerte 2: Baisse du panier moyen (mêmes périodes)
         if kpis['evolution_panier'] < -5:
             alerts['warnings'].append({
                 'titre': ' Diminution du panier moyen',
-                'description': f"Le panier moyen a baissé de {abs(kpis['evolution_panier']):.1f}% sur le dernier mois"
+                'description': f"Le panier moyen a baissé de {abs(kpis['evolution_panier']):.1f}% par rapport à la même période du mois précédent"
+            })
+        
+        # Alerte 2 bis: Jours ou semaines anormaux (fenêtres glissantes)
+        for _, anomalie in baisses.iterrows():
+            titre = {
+                'ca': ' Chute anormale du CA',
+                'nb_transactions': ' Chute du nombre de transactions',
+                'panier_moyen': ' Panier moyen anormalement bas'
+            }[anomalie['indicateur']]
+            niveau = 'critiques' if anomalie['indicateur'] == 'ca' else 'warnings'
+            alerts[niveau].append({
+                'titre': titre,
+                'description': self._describe_anomalie(anomalie)
             })
         
         # Alerte 3: Faible taux de rétention
@@ -144,7 +278,14 @@ class DataAnalyzer:
         if kpis['evolution_ca'] > 15:
             alerts['opportunites'].append({
                 'titre': ' Forte croissance détectée',
-                'description': f"CA en hausse de {kpis['evolution_ca']:.1f}% : moment idéal pour accélérer (marketing, stock, équipe)"
+                'description': f"CA en hausse de {kpis['evolution_ca']:.1f}% par rapport à la même période du mois précédent : moment idéal pour accélérer (marketing, stock, équipe)"
+            })
+        
+        # Opportunité 3: Pic d'activité récent
+        for _, anomalie in hausses[hausses['indicateur'] == 'ca'].iterrows():
+            alerts['opportunites'].append({
+                'titre': ' Pic de CA détecté',
+                'description': self._describe_anomalie(anomalie) + " : identifier ce qui l'a provoqué pour le reproduire"
             })
         
         return alerts
@@ -210,12 +351,13 @@ class DataAnalyzer:
         
         return recommendations
     
-    def get_health_score(self, kpis):
+    def get_health_score(self, kpis, qualite=None):
         """
         Calcule un score de santé global (0-100)
         
         Args:
             kpis: Dictionnaire des KPIs
+            qualite: Rapport de qualité des données (optionnel)
             
         Returns:
             tuple: (score, statut)
@@ -239,6 +381,13 @@ class DataAnalyzer:
         if kpis['concentration_ca'] > 70:
             score -= 10
         
+        # Pénalité qualité des données
+        if qualite is not None:
+            if qualite['taux_lignes_valides'] < 90:
+                score -= 10
+            elif qualite['taux_lignes_valides'] < 98:
+                score -= 5
+        
         # Déterminer le statut
         if score >= 80:
             statut = "Excellente"
@@ -0,0 +1,232 @@
+import pandas as pd
+from date_parser import parse_dates
+
+# Colonnes minimales attendues dans le fichier importé
+REQUIRED_COLUMNS = ['date', 'client_id', 'montant', 'statut']
+
+# Valeurs de statut reconnues par l'outil
+STATUTS_CONNUS = ('complete', 'en_attente', 'annule', 'rembourse')
+
+# Plage de dates jugée plausible pour des transactions
+DATE_MIN_VALIDE = pd.Timestamp('2000-01-01')
+
+# Taille de l'échantillon lu avant le chargement complet
+TAILLE_ECHANTILLON = 500
+
+# Part maximale de valeurs illisibles tolérée dans l'échantillon
+SEUIL_REJET_ECHANTILLON = 0.5
+
+
+class DataQualityError(ValueError):
+    """Erreur levée quand un fichier est rejeté avant son chargement complet"""
+
+
+def default_date_max():
+    """Borne haute (exclue) des dates plausibles : le lendemain d'aujourd'hui"""
+    return pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+
+
+def _read(uploaded_file, nrows=None):
+    """Lit un fichier CSV ou Excel, éventuellement limité à nrows lignes"""
+    if uploaded_file.name.endswith('.csv'):
+        return pd.read_csv(uploaded_file, nrows=nrows)
+    return pd.read_excel(uploaded_file, nrows=nrows)
+
+
+def sniff_file(uploaded_file, nrows=TAILLE_ECHANTILLON):
+    """
+    Inspecte l'en-tête et un échantillon du fichier avant de le charger
+
+    Le fichier est rejeté immédiatement si des colonnes manquent ou si la
+    majorité des dates ou des montants de l'échantillon sont illisibles.
+    La position de lecture est remise au début pour le chargement complet.
+
+    Args:
+        uploaded_file: Fichier importé (objet avec attribut name, seek et read)
+        nrows: Nombre de lignes à échantillonner
+
+    Returns:
+        DataFrame: Échantillon lu
+
+    Raises:
+        DataQualityError: Si le fichier est inexploitable
+    """
+    try:
+        sample = _read(uploaded_file, nrows=nrows)
+    finally:
+        uploaded_file.seek(0)
+
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in sample.columns]
+    if missing_columns:
+        raise DataQualityError(f"Colonnes manquantes : {', '.join(missing_columns)}")
+
+    if sample.empty:
+        raise DataQualityError("Le fichier ne contient aucune ligne de données")
+
+    dates = sample['date'].dropna()
+    if len(dates) > 0:
+        dates_invalides = parse_dates(dates).isna().mean()
+        if dates_invalides > SEUIL_REJET_ECHANTILLON:
+            raise DataQualityError(
+                f"{dates_invalides:.0%} des dates de l'échantillon sont illisibles"
+            )
+
+    montants = sample['montant'].dropna()
+    if len(montants) > 0:
+        montants_invalides = pd.to_numeric(montants, errors='coerce').isna().mean()
+        if montants_invalides > SEUIL_REJET_ECHANTILLON:
+            raise DataQualityError(
+                f"{montants_invalides:.0%} des montants de l'échantillon ne sont pas numériques"
+            )
+
+    return sample
+
+
+def load_file(uploaded_file):
+    """
+    Valide un échantillon puis charge le fichier complet
+
+    Args:
+        uploaded_file: Fichier importé (CSV ou Excel)
+
+    Returns:
+        DataFrame: Données complètes
+
+    Raises:
+        DataQualityError: Si l'échantillon est rejeté
+    """
+    sniff_file(uploaded_file)
+    return _read(uploaded_file)
+
+
+def normalize_statut(statuts):
+    """
+    Normalise les statuts (espaces superflus, casse) avant toute comparaison
+
+    Args:
+        statuts: Series des statuts bruts
+
+    Returns:
+        Series: Statuts en minuscules sans espaces de bord (NA conservés)
+    """
+    return statuts.astype('string').str.strip().str.lower()
+
+
+def _quality_masks(df, dates=None, date_max=None):
+    """
+    Calcule, en une passe vectorisée, un masque booléen par type d'anomalie
+
+    Args:
+        df: DataFrame avec colonnes [date, client_id, montant, statut]
+        dates: Dates déjà converties par parse_dates (évite un second parsing)
+        date_max: Date maximale plausible (aujourd'hui par défaut)
+
+    Returns:
+        dict: Masques (nulls par colonne, dates, montants, statuts, doublons)
+            et masque 'invalide' des lignes inexploitables
+    """
+    if date_max is None:
+        date_max = default_date_max()
+
+    # Valeurs manquantes par colonne
+    nulls = df[REQUIRED_COLUMNS].isna()
+
+    # Dates illisibles ou hors plage
+    if dates is None:
+        dates = parse_dates(df['date'])
+    date_invalide = dates.isna() & ~nulls['date']
+    date_hors_plage = (dates < DATE_MIN_VALIDE) | (dates >= date_max)
+
+    # Montants non numériques ou négatifs
+    montants = pd.to_numeric(df['montant'], errors='coerce')
+    montant_invalide = montants.isna() & ~nulls['montant']
+    montant_negatif = montants < 0
+
+    # Statuts inconnus (comparés après normalisation, comme dans l'analyseur)
+    statuts = normalize_statut(df['statut'])
+    statut_inconnu = ~statuts.isin(STATUTS_CONNUS) & ~nulls['statut']
+
+    # Transactions dupliquées (lignes identiques sur les colonnes clés)
+    doublon = df.duplicated(subset=REQUIRED_COLUMNS)
+
+    invalide = (
+        nulls.any(axis=1)
+        | date_invalide
+        | date_hors_plage
+        | montant_invalide
+        | montant_negatif
+    )
+
+    return {
+        'nulls': nulls,
+        'date_invalide': date_invalide,
+        'date_hors_plage': date_hors_plage,
+        'montant_invalide': montant_invalide,
+        'montant_negatif': montant_negatif,
+        'statut_inconnu': statut_inconnu,
+        'doublon': doublon,
+        'invalide': invalide,
+    }
+
+
+def valid_rows_mask(df, dates=None, date_max=None):
+    """
+    Sélectionne les lignes exploitables pour l'analyse
+
+    Sont écartées les lignes que le rapport de qualité compte comme
+    invalides (valeurs manquantes, dates illisibles ou hors plage, montants
+    non numériques ou négatifs) ainsi que les doublons.
+
+    Args:
+        df: DataFrame avec colonnes [date, client_id, montant, statut]
+        dates: Dates déjà converties par parse_dates
+        date_max: Date maximale plausible (aujourd'hui par défaut)
+
+    Returns:
+        Series: Masque booléen des lignes à conserver
+    """
+    return _lignes_valides(_quality_masks(df, dates=dates, date_max=date_max))
+
+
+def _lignes_valides(masks):
+    """Lignes ni invalides ni en double, à partir des masques de _quality_masks"""
+    return ~(masks['invalide'] | masks['doublon'])
+
+
+def check_quality(df, date_max=None, dates=None):
+    """
+    Profile la qualité des données en une passe vectorisée
+
+    Args:
+        df: DataFrame avec colonnes [date, client_id, montant, statut]
+        date_max: Date maximale plausible (aujourd'hui par défaut)
+        dates: Dates déjà converties par parse_dates (évite un second parsing)
+
+    Returns:
+        dict: Rapport de qualité (compteurs par type d'anomalie) et masque
+            'lignes_valides' des lignes à analyser, à transmettre à
+            DataAnalyzer pour éviter un second profilage
+    """
+    masks = _quality_masks(df, dates=dates, date_max=date_max)
+
+    nb_lignes = len(df)
+    nb_lignes_invalides = int(masks['invalide'].sum())
+
+    if nb_lignes > 0:
+        taux_lignes_valides = (1 - nb_lignes_invalides / nb_lignes) * 100
+    else:
+        taux_lignes_valides = 0.0
+
+    return {
+        'nb_lignes': nb_lignes,
+        'valeurs_manquantes': {col: int(n) for col, n in masks['nulls'].sum().items()},
+        'dates_invalides': int(masks['date_invalide'].sum()),
+        'dates_hors_plage': int(masks['date_hors_plage'].sum()),
+        'montants_non_numeriques': int(masks['montant_invalide'].sum()),
+        'montants_negatifs': int(masks['montant_negatif'].sum()),
+        'doublons': int(masks['doublon'].sum()),
+        'statuts_inconnus': int(masks['statut_inconnu'].sum()),
+        'nb_lignes_invalides': nb_lignes_invalides,
+        'taux_lignes_valides': taux_lignes_valides,
+        'lignes_valides': _lignes_valides(masks),
+    }
@@ -0,0 +1,80 @@
+import warnings
+
+import pandas as pd
+import numpy as np
+from pandas.tseries.api import guess_datetime_format
+
+
+def infer_date_format(values):
+    """
+    Devine le format de date à partir de la première valeur renseignée
+
+    Le mois est d'abord cherché en deuxième position (2024-12-05,
+    12/25/2024). Si pandas ne trouve rien ou signale que le jour vient en
+    premier (25/12/2024, cas courant des fichiers français), le format est
+    deviné avec dayfirst=True, sans avertissement.
+
+    Args:
+        values: Valeurs de dates brutes (Series, Index ou tableau)
+
+    Returns:
+        str: Format strftime deviné, ou None si aucun format n'est reconnu
+    """
+    for value in values:
+        if isinstance(value, str) and value.strip():
+            return _guess_format(value.strip())
+    return None
+
+
+def _guess_format(value):
+    """Devine le format d'une valeur, en essayant dayfirst=True si nécessaire"""
+    with warnings.catch_warnings(record=True) as alertes:
+        warnings.simplefilter('always')
+        date_format = guess_datetime_format(value, dayfirst=False)
+
+    jour_en_premier = any('dayfirst' in str(alerte.message) for alerte in alertes)
+    if date_format is None or jour_en_premier:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            date_format = guess_datetime_format(value, dayfirst=True) or date_format
+    return date_format
+
+
+def parse_dates(series):
+    """
+    Convertit une colonne de dates en datetime en ne parsant que les valeurs uniques
+
+    Les fichiers de transactions répètent chaque date des milliers de fois :
+    le format est déduit une seule fois, seules les chaînes distinctes sont
+    converties puis le résultat est redistribué sur toutes les lignes.
+    Les valeurs illisibles deviennent NaT.
+
+    Args:
+        series: Series pandas contenant les dates brutes
+
+    Returns:
+        Series: Dates au format datetime64, même index que l'entrée
+    """
+    # Déjà converties (ex : fichier Excel ou second appel)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    codes, uniques = pd.factorize(series)
+    date_format = infer_date_format(uniques)
+
+    if date_format is not None:
+        parsed = pd.to_datetime(uniques, errors='coerce', format=date_format)
+        # Rattrapage des valeurs qui ne suivent pas le format majoritaire
+        a_reprendre = np.asarray(parsed.isna())
+        if a_reprendre.any():
+            valeurs = parsed.values.copy()
+            valeurs[a_reprendre] = pd.to_datetime(
+                uniques[a_reprendre], errors='coerce', format='mixed'
+            ).values.astype(valeurs.dtype)
+            parsed = pd.DatetimeIndex(valeurs)
+    else:
+        parsed = pd.to_datetime(uniques, errors='coerce', format='mixed')
+
+    # Le code -1 (valeur manquante) pointe sur le NaT ajouté en fin de tableau
+    values = np.append(parsed.values, np.datetime64('NaT'))
+    return pd.Series(values.take(codes), index=series.index, name=series.name)
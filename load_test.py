@@ -0,0 +1,245 @@
+"""
+Test de charge de l'application Streamlit
+
+Simule N sessions d'analystes simultanées sur app.py. Chaque session
+importe un fichier généré puis clique sur "Analyser mes données".
+
+AppTest s'appuie sur un runtime Streamlit global au processus et ne peut pas
+être utilisé depuis plusieurs threads : chaque utilisateur simulé tourne donc
+dans son propre processus. L'option --cores restreint tous ces processus aux
+mêmes coeurs pour reproduire une instance unique (un serveur Streamlit
+exécute ses sessions dans des threads d'un seul processus, donc sur un coeur
+à la fois à cause du GIL). Chaque processus exécute une session de
+chauffe hors chrono (imports, première exécution de app.py) avant la
+mesure. Les journaux Streamlit partent sur stderr, le rapport sur stdout.
+
+Usage :
+    python load_test.py --concurrency 1 2 4 8 --rows 1000 50000 --cores 1
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+LABEL_ANALYSE = 'Analyser mes données'
+PERCENTILES = (50, 95, 99)
+
+# Barrière partagée par les processus du pool (voir _init_worker)
+_barrier = None
+
+
+def generate_csv(n_rows, seed=0):
+    """
+    Génère un fichier CSV de transactions au format attendu par l'application
+
+    Args:
+        n_rows: Nombre de lignes
+        seed: Graine du générateur aléatoire
+
+    Returns:
+        bytes: Contenu du fichier CSV
+    """
+    rng = np.random.default_rng(seed)
+    nb_clients = max(1, n_rows // 10)
+    dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 730, n_rows), unit='D')
+    df = pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d'),
+        'client_id': np.char.add('C', rng.integers(0, nb_clients, n_rows).astype(str)),
+        'montant': rng.gamma(3, 30, n_rows).round(2),
+        'statut': rng.choice(['complete', 'annule', 'rembourse'], n_rows, p=[0.9, 0.07, 0.03])
+    })
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def current_rss_mb():
+    """Mémoire résidente du processus en Mo (pic si /proc n'est pas disponible)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss est en Ko sous Linux, en octets sous macOS
+        return maxrss / 1024 if os.uname().sysname != 'Darwin' else maxrss / 1024 ** 2
+
+
+def _timed_run(at):
+    """Exécute un rerun et renvoie sa durée en secondes"""
+    debut = time.perf_counter()
+    at.run()
+    return time.perf_counter() - debut
+
+
+def run_session(file_name, content, timeout):
+    """
+    Simule une session : chargement, import du fichier puis analyse
+
+    Args:
+        file_name: Nom du fichier importé
+        content: Contenu du fichier
+        timeout: Délai maximal d'un rerun (secondes)
+
+    Returns:
+        dict: Durée de chaque rerun (chargement, upload, analyse)
+
+    Raises:
+        RuntimeError: Si l'application lève une exception ou affiche une erreur
+    """
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    durees = {'chargement': _timed_run(at)}
+
+    at.file_uploader[0].upload(file_name, content, 'text/csv')
+    durees['upload'] = _timed_run(at)
+
+    bouton = next(b for b in at.button if b.label.strip() == LABEL_ANALYSE)
+    bouton.click()
+    durees['analyse'] = _timed_run(at)
+
+    if at.exception or at.error:
+        messages = [e.value for e in at.exception] + [e.value for e in at.error]
+        raise RuntimeError(f"Session en erreur : {messages}")
+
+    return durees
+
+
+def _init_worker(cores, barrier):
+    """Restreint le processus courant aux coeurs demandés (Linux uniquement)"""
+    global _barrier
+    _barrier = barrier
+    if cores and hasattr(os, 'sched_setaffinity'):
+        # Choisis parmi les coeurs autorisés (cpuset d'un conteneur : pas forcément 0..n-1)
+        os.sched_setaffinity(0, set(sorted(os.sched_getaffinity(0))[:cores]))
+
+
+def _session_worker(file_name, content, timeout):
+    """Exécute une session dans un processus du pool et mesure sa mémoire"""
+    # AppTest remplace __main__ par app.py : le restaurer pour les tâches suivantes
+    main_module = sys.modules['__main__']
+    try:
+        durees = run_session(file_name, content, timeout)
+        erreur = None
+    except Exception as e:
+        durees, erreur = {}, str(e)
+    finally:
+        sys.modules['__main__'] = main_module
+    return durees, erreur, current_rss_mb()
+
+
+def _warmup_worker(file_name, content, timeout):
+    """
+    Session de chauffe hors chrono, une par processus du pool
+
+    La barrière bloque chaque processus après sa chauffe jusqu'à ce que
+    tous aient terminé la leur : aucun ne peut prendre deux tâches de chauffe.
+    """
+    _session_worker(file_name, content, timeout)
+    _barrier.wait()
+
+
+def run_level(concurrency, file_name, content, sessions_per_worker, timeout, cores=None):
+    """
+    Lance `concurrency` utilisateurs simultanés, `sessions_per_worker` sessions chacun
+
+    Args:
+        concurrency: Nombre de processus (utilisateurs simultanés)
+        file_name: Nom du fichier importé
+        content: Contenu du fichier
+        sessions_per_worker: Sessions successives par utilisateur
+        timeout: Délai maximal d'un rerun (secondes)
+        cores: Nombre de coeurs partagés par tous les processus (tous si None)
+
+    Returns:
+        dict: Durées par étape, nombre de reruns, erreurs, durée totale et mémoire
+    """
+    durees = {'chargement': [], 'upload': [], 'analyse': []}
+    erreurs = []
+    rss = []
+
+    barrier = multiprocessing.Barrier(concurrency)
+    with ProcessPoolExecutor(max_workers=concurrency, initializer=_init_worker, initargs=(cores, barrier)) as pool:
+        # Démarrage des processus et première exécution de app.py hors chrono
+        for future in [pool.submit(_warmup_worker, file_name, content, timeout) for _ in range(concurrency)]:
+            future.result()
+
+        debut = time.perf_counter()
+        futures = [
+            pool.submit(_session_worker, file_name, content, timeout)
+            for _ in range(concurrency * sessions_per_worker)
+        ]
+        for future in futures:
+            resultat, erreur, rss_mb = future.result()
+            rss.append(rss_mb)
+            if erreur:
+                erreurs.append(erreur)
+            for etape, duree in resultat.items():
+                durees[etape].append(duree)
+        total = time.perf_counter() - debut
+
+    return {
+        'durees': durees,
+        'nb_reruns': sum(len(v) for v in durees.values()),
+        'erreurs': erreurs,
+        'total': total,
+        'rss_mb': max(rss),
+    }
+
+
+def format_level(rows, concurrency, resultat):
+    """Met en forme les statistiques d'un palier de concurrence"""
+    lignes = []
+    for etape, valeurs in resultat['durees'].items():
+        if not valeurs:
+            continue
+        p = np.percentile(np.array(valeurs) * 1000, PERCENTILES)
+        lignes.append(
+            f"{rows:>9} {concurrency:>5} {etape:<11} "
+            + " ".join(f"{v:>9.0f}" for v in p)
+        )
+    debit = resultat['nb_reruns'] / resultat['total'] if resultat['total'] > 0 else 0
+    lignes.append(
+        f"{'':>9} {'':>5} débit : {debit:.2f} reruns/s, "
+        f"RSS max par processus : {resultat['rss_mb']:.0f} Mo, "
+        f"erreurs : {len(resultat['erreurs'])}"
+    )
+    return "\n".join(lignes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge de l'application Streamlit")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="Nombres de sessions simultanées à tester")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 20000],
+                        help="Tailles des fichiers générés (lignes)")
+    parser.add_argument('--sessions', type=int, default=3,
+                        help="Sessions successives par utilisateur simulé")
+    parser.add_argument('--timeout', type=float, default=120,
+                        help="Délai maximal d'un rerun (secondes)")
+    parser.add_argument('--cores', type=int, default=None,
+                        help="Coeurs partagés par toutes les sessions (1 = une instance Streamlit)")
+    args = parser.parse_args()
+
+    if not hasattr(AppTest, 'file_uploader'):
+        raise SystemExit("Cette version de Streamlit ne permet pas de simuler un upload avec AppTest")
+
+    print(f"{'lignes':>9} {'conc.':>5} {'étape':<11} " + " ".join(f"{'p' + str(p) + ' (ms)':>9}" for p in PERCENTILES))
+    for rows in args.rows:
+        content = generate_csv(rows)
+        for concurrency in args.concurrency:
+            resultat = run_level(
+                concurrency, f"ventes_{rows}.csv", content, args.sessions, args.timeout, args.cores
+            )
+            print(format_level(rows, concurrency, resultat))
+            for erreur in resultat['erreurs'][:3]:
+                print(f"{'':>16} ! {erreur}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+import atexit
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import pandas as pd
+import numpy as np
+
+from data_analyzer import DataAnalyzer
+
+# Pool de processus conservé entre les appels (créé à la première utilisation)
+_pool = None
+_pool_workers = 0
+
+
+def _get_pool(n_workers):
+    """
+    Renvoie le pool de processus partagé, recréé seulement si sa taille change
+
+    Démarrer des processus coûte plusieurs centaines de millisecondes : le
+    pool est donc réutilisé d'un appel à l'autre et fermé à la sortie.
+
+    Args:
+        n_workers: Nombre de processus souhaité
+
+    Returns:
+        ProcessPoolExecutor: Pool prêt à l'emploi
+    """
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != n_workers:
+        shutdown_pool()
+        _pool = ProcessPoolExecutor(max_workers=n_workers)
+        _pool_workers = n_workers
+    return _pool
+
+
+def shutdown_pool():
+    """Arrête le pool de processus partagé s'il existe"""
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown()
+        _pool, _pool_workers = None, 0
+
+
+atexit.register(shutdown_pool)
+
+
+def _to_shared(array):
+    """Copie un tableau numpy dans un segment de mémoire partagée"""
+    shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+    return shm
+
+
+def _on_shared(segments, n_rows, fonction, *args):
+    """
+    Applique une fonction aux colonnes lues en mémoire partagée (dans un worker)
+
+    Seuls les noms des segments transitent entre processus ; les vues sont
+    libérées avant la fermeture des segments.
+
+    Args:
+        segments: Dictionnaire colonne -> (nom du segment, dtype)
+        n_rows: Nombre de lignes de chaque colonne
+        fonction: Fonction appelée avec le dictionnaire des colonnes puis *args
+
+    Returns:
+        Résultat de la fonction
+    """
+    attached = {nom: shared_memory.SharedMemory(name=shm_name) for nom, (shm_name, _) in segments.items()}
+    try:
+        colonnes = {
+            nom: np.ndarray((n_rows,), dtype=segments[nom][1], buffer=shm.buf)
+            for nom, shm in attached.items()
+        }
+        resultat = fonction(colonnes, *args)
+        del colonnes
+        return resultat
+    finally:
+        for shm in attached.values():
+            shm.close()
+
+
+def _map_range(colonnes, debut, fin, n_buckets):
+    """
+    Étape 1 : hache les clients d'une plage de lignes et agrège ses jours
+
+    Le bucket de chaque ligne (hachage stable de client_id modulo n_buckets)
+    est écrit dans la colonne partagée 'bucket' ; les totaux journaliers,
+    additifs, sont calculés directement sur la plage.
+    """
+    clients = colonnes['client'][debut:fin]
+    montants = colonnes['montant'][debut:fin]
+    dates = colonnes['date'][debut:fin]
+
+    colonnes['bucket'][debut:fin] = pd.util.hash_array(clients) % np.uint64(n_buckets)
+
+    # Agrégats journaliers, indexés à partir du premier jour de la plage
+    jours = dates.astype('datetime64[D]').astype(np.int64)
+    premier_jour = int(jours.min())
+    ca_par_jour = np.bincount(jours - premier_jour, weights=montants)
+    nb_par_jour = np.bincount(jours - premier_jour)
+
+    return premier_jour, ca_par_jour, nb_par_jour, dates.max()
+
+
+def _reduce_bucket(colonnes, bucket):
+    """
+    Étape 2 : sommes et comptes des clients d'un bucket, sur toutes les lignes
+
+    Un client appartient à un seul bucket : les résultats des buckets sont
+    disjoints et se concatènent sans nouvelle agrégation.
+    """
+    lignes = np.flatnonzero(colonnes['bucket'] == bucket)
+    codes, uniques = pd.factorize(colonnes['client'][lignes])
+    achats = np.bincount(codes, minlength=len(uniques))
+    ca_clients = np.bincount(codes, weights=colonnes['montant'][lignes], minlength=len(uniques))
+    return uniques, achats, ca_clients
+
+
+def _map_task(task):
+    """Exécute l'étape 1 sur une plage : (segments, n_rows, debut, fin, n_buckets)"""
+    segments, n_rows, debut, fin, n_buckets = task
+    return _on_shared(segments, n_rows, _map_range, debut, fin, n_buckets)
+
+
+def _reduce_task(task):
+    """Exécute l'étape 2 sur un bucket : (segments, n_rows, bucket)"""
+    segments, n_rows, bucket = task
+    return _on_shared(segments, n_rows, _reduce_bucket, bucket)
+
+
+def _shared_clients(clients):
+    """
+    Convertit client_id en tableau numpy partageable, sans fusionner de clients
+
+    Les identifiants de types mélangés (1 et "1", fréquents dans les
+    fichiers Excel) sont des clients distincts pour pandas mais deviendraient
+    identiques une fois convertis en chaînes : ils ne sont pas partagés.
+
+    Args:
+        clients: Colonne client_id
+
+    Returns:
+        ndarray: Identifiants en dtype numpy natif, ou None si les types sont mélangés
+    """
+    if pd.api.types.is_numeric_dtype(clients):
+        return clients.to_numpy()
+
+    genre = pd.api.types.infer_dtype(clients, skipna=False)
+    if genre == 'string':
+        # Les objets Python ne passent pas en mémoire partagée : chaînes de largeur fixe
+        return clients.to_numpy(dtype=str)
+    if genre == 'integer':
+        return clients.to_numpy(dtype=np.int64)
+    if genre in ('floating', 'mixed-integer-float'):
+        return clients.to_numpy(dtype=np.float64)
+    return None
+
+
+class ParallelDataAnalyzer(DataAnalyzer):
+    """Analyseur qui répartit le calcul des agrégats sur plusieurs processus"""
+
+    def __init__(self, df, n_workers=None, lignes_valides=None):
+        """
+        Initialise l'analyseur parallèle
+
+        Args:
+            df: DataFrame pandas avec colonnes [date, client_id, montant, statut]
+            n_workers: Nombre de processus (nombre de coeurs par défaut)
+            lignes_valides: Masque des lignes exploitables calculé par check_quality
+        """
+        self.n_workers = n_workers or os.cpu_count() or 1
+        super().__init__(df, lignes_valides)
+
+    def _aggregates(self):
+        """
+        Calcule les agrégats en map-reduce sur un pool de processus
+
+        Les colonnes brutes sont copiées une fois en mémoire partagée, puis
+        traitées en deux étapes parallèles :
+        1. chaque worker prend une plage de lignes contiguës, y hache les
+           identifiants clients vers n_workers buckets (écrits en mémoire
+           partagée) et calcule les totaux journaliers de sa plage ;
+        2. chaque worker agrège les clients d'un bucket sur toutes les lignes.
+        Les buckets étant disjoints, le processus principal concatène les
+        résultats par client sans regroupement et additionne les totaux
+        journaliers. Les KPIs sont identiques au calcul mono-processus (aux
+        arrondis flottants près).
+
+        Returns:
+            dict: Mêmes agrégats que DataAnalyzer._aggregates
+        """
+        if len(self.df) == 0:
+            return super()._aggregates()
+
+        clients = _shared_clients(self.df['client_id'])
+        if clients is None:
+            # Types d'identifiants mélangés : calcul mono-processus
+            return super()._aggregates()
+
+        n_rows = len(self.df)
+        n_buckets = self.n_workers
+        colonnes = {
+            'client': clients,
+            'montant': self.df['montant'].to_numpy(dtype=np.float64),
+            'date': self.df['date'].to_numpy(),
+            'bucket': np.zeros(n_rows, dtype=np.uint32),
+        }
+        bornes = np.linspace(0, n_rows, min(self.n_workers, n_rows) + 1).astype(np.int64)
+
+        shms = {nom: _to_shared(valeurs) for nom, valeurs in colonnes.items()}
+        try:
+            segments = {nom: (shm.name, colonnes[nom].dtype.str) for nom, shm in shms.items()}
+            del colonnes, clients
+
+            map_tasks = [(segments, n_rows, debut, fin, n_buckets) for debut, fin in zip(bornes[:-1], bornes[1:])]
+            reduce_tasks = [(segments, n_rows, bucket) for bucket in range(n_buckets)]
+            try:
+                partiels_jours, partiels_clients = self._map_reduce(map_tasks, reduce_tasks)
+            except BrokenProcessPool:
+                # Worker tué (mémoire, signal) : on repart d'un pool neuf une fois
+                shutdown_pool()
+                partiels_jours, partiels_clients = self._map_reduce(map_tasks, reduce_tasks)
+        finally:
+            for shm in shms.values():
+                shm.close()
+                shm.unlink()
+
+        # Buckets disjoints : simple concaténation des résultats par client
+        uniques, achats, ca_clients = zip(*partiels_clients)
+        index_clients = pd.Index(np.concatenate(uniques))
+        achats_par_client = pd.Series(np.concatenate(achats), index=index_clients)
+        ca_par_client = pd.Series(np.concatenate(ca_clients), index=index_clients)
+
+        # Fusion par jour : chaque plage couvre un intervalle de jours décalé
+        premiers_jours, ca_jours, nb_jours, dates_max = zip(*partiels_jours)
+        origine = min(premiers_jours)
+        etendue = max(p + len(c) for p, c in zip(premiers_jours, ca_jours)) - origine
+        ca_par_jour = np.zeros(etendue, dtype=np.float64)
+        nb_par_jour = np.zeros(etendue, dtype=np.int64)
+        for premier, ca_jour, nb_jour in zip(premiers_jours, ca_jours, nb_jours):
+            debut = premier - origine
+            ca_par_jour[debut:debut + len(ca_jour)] += ca_jour
+            nb_par_jour[debut:debut + len(nb_jour)] += nb_jour
+
+        index_jours = pd.date_range(pd.Timestamp(np.datetime64(origine, 'D')), periods=etendue, freq='D')
+        daily = pd.DataFrame({'ca': ca_par_jour, 'nb_transactions': nb_par_jour}, index=index_jours)
+        daily = daily[daily['nb_transactions'] > 0]
+
+        par_mois = daily.groupby(daily.index.to_period('M'))
+
+        return {
+            'achats_par_client': achats_par_client,
+            'ca_par_client': ca_par_client,
+            'ca_mensuel': par_mois['ca'].sum(),
+            'nb_mensuel': par_mois['nb_transactions'].sum(),
+            'daily': daily,
+            'date_fin': pd.Timestamp(max(dates_max))
+        }
+
+    def _map_reduce(self, map_tasks, reduce_tasks):
+        """Enchaîne les deux étapes sur le pool partagé"""
+        pool = _get_pool(self.n_workers)
+        partiels_jours = list(pool.map(_map_task, map_tasks))
+        partiels_clients = list(pool.map(_reduce_task, reduce_tasks))
+        return partiels_jours, partiels_clients
+
+
+def _donnees_benchmark(n_rows, nb_clients=None, seed=0):
+    """Génère des transactions synthétiques pour le benchmark"""
+    rng = np.random.default_rng(seed)
+    nb_clients = nb_clients or max(1, n_rows // 20)
+    return pd.DataFrame({
+        'date': pd.Timestamp('2021-01-01') + pd.to_timedelta(rng.integers(0, 3 * 365, n_rows), unit='D'),
+        'client_id': rng.integers(0, nb_clients, n_rows),
+        'montant': rng.gamma(3, 30, n_rows).round(2),
+        'statut': 'complete'
+    })
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark du calcul parallèle des KPIs")
+    parser.add_argument('--rows', type=int, default=5_000_000, help="Nombre de transactions générées")
+    parser.add_argument('--workers', type=int, nargs='+', default=None, help="Nombres de processus à tester")
+    args = parser.parse_args()
+
+    nb_coeurs = os.cpu_count() or 1
+    workers = args.workers or sorted({n for n in (1, 2, 4, 8, 16, 32) if n <= nb_coeurs} | {nb_coeurs})
+    df = _donnees_benchmark(args.rows)
+
+    analyzer = DataAnalyzer(df)
+    debut = time.perf_counter()
+    reference = analyzer.get_kpis()
+    duree_ref = time.perf_counter() - debut
+    print(f"{args.rows} lignes, {os.cpu_count()} coeurs")
+    print(f"mono-processus (pandas) : {duree_ref:.2f}s")
+
+    for n in workers:
+        parallel = ParallelDataAnalyzer(df, n_workers=n)
+        # Premier appel hors chrono : démarrage du pool, réutilisé ensuite
+        parallel.get_kpis()
+        debut = time.perf_counter()
+        kpis = parallel.get_kpis()
+        duree = time.perf_counter() - debut
+        identiques = all(
+            np.isclose(kpis[k], reference[k])
+            for k in ['ca_total', 'nb_transactions', 'nb_clients', 'freq_achat_moyenne',
+                      'taux_retention', 'concentration_ca', 'evolution_ca', 'evolution_panier']
+        )
+        print(f"{n:>3} processus : {duree:.2f}s (x{duree_ref / duree:.1f}) - KPIs identiques : {identiques}")
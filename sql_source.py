@@ -0,0 +1,168 @@
+import re
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+
+from data_analyzer import DataAnalyzer
+from data_quality import DATE_MIN_VALIDE, default_date_max
+
+# Noms de table autorisés (interpolés dans les requêtes SQL)
+_IDENTIFIANT = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$')
+
+
+class SQLDataAnalyzer(DataAnalyzer):
+    """
+    Analyseur qui délègue les agrégations à une base de données
+
+    Les filtres (doublons, valeurs manquantes, dates hors plage, montants
+    invalides, statut normalisé) et les GROUP BY (par client, par jour) sont
+    exécutés en SQL : seuls les agrégats nécessaires à get_kpis sont
+    rapatriés, jamais les transactions. Les expressions de date sont
+    écrites pour SQLite (dates ISO 8601) ; une sous-classe peut les redéfinir
+    pour un autre moteur.
+
+    S'utilise comme gestionnaire de contexte pour fermer la connexion :
+
+        with SQLDataAnalyzer.from_sqlite('ventes.db') as analyzer:
+            kpis = analyzer.get_kpis()
+    """
+
+    # Expressions SQL qui ramènent la colonne date au jour et à la date-heure
+    EXPR_JOUR = "date(date)"
+    EXPR_DATE = "datetime(date)"
+
+    # Montant lisible comme un nombre (équivalent de pd.to_numeric) : valeur
+    # numérique, ou texte que SQLite convertit sans perte ('10', '12.50')
+    EXPR_MONTANT_NUMERIQUE = (
+        "(typeof(montant) IN ('integer', 'real') "
+        "OR (typeof(montant) = 'text' AND montant = CAST(montant AS NUMERIC)))"
+    )
+
+    def __init__(self, connection, table='transactions'):
+        """
+        Initialise l'analyseur sur une connexion DB-API
+
+        Args:
+            connection: Connexion DB-API 2.0 ouverte (sqlite3, psycopg...)
+            table: Table contenant les colonnes [date, client_id, montant, statut]
+
+        Raises:
+            ValueError: Si le nom de table n'est pas un identifiant SQL simple
+        """
+        if not _IDENTIFIANT.match(table):
+            raise ValueError(f"Nom de table invalide : {table}")
+
+        self.connection = connection
+        self.table = table
+        # Les transactions restent en base : aucun DataFrame n'est chargé
+        self.df = None
+
+    @classmethod
+    def from_sqlite(cls, path, table='transactions'):
+        """
+        Ouvre un fichier SQLite local en lecture seule
+
+        Args:
+            path: Chemin du fichier .db / .sqlite
+            table: Table des transactions
+
+        Returns:
+            SQLDataAnalyzer: Analyseur connecté au fichier
+        """
+        uri = Path(path).resolve().as_uri() + '?mode=ro'
+        connection = sqlite3.connect(uri, uri=True)
+        return cls(connection, table)
+
+    def close(self):
+        """Ferme la connexion à la base"""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _query(self, sql):
+        """Exécute une requête et renvoie toutes les lignes"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _source(self):
+        """Transactions dédoublonnées (comme valid_rows_mask côté pandas)"""
+        return f"(SELECT DISTINCT date, client_id, montant, statut FROM {self.table}) AS t"
+
+    def _where(self):
+        """
+        Clause de filtrage commune, alignée sur DataAnalyzer._prepare_data
+
+        Écarte les valeurs manquantes, les dates illisibles ou hors plage et
+        les montants non numériques ou négatifs, puis garde les transactions complètes
+        (statut comparé sans casse ni espaces).
+        """
+        date_min = DATE_MIN_VALIDE.strftime('%Y-%m-%d')
+        date_max = default_date_max().strftime('%Y-%m-%d')
+        return (
+            f"WHERE LOWER(TRIM(statut)) = 'complete' "
+            f"AND client_id IS NOT NULL "
+            f"AND {self.EXPR_MONTANT_NUMERIQUE} "
+            f"AND CAST(montant AS REAL) >= 0 "
+            f"AND {self.EXPR_JOUR} >= '{date_min}' "
+            f"AND {self.EXPR_JOUR} < '{date_max}'"
+        )
+
+    def _aggregates(self):
+        """
+        Calcule les agrégats par requêtes SQL (GROUP BY côté base)
+
+        Deux requêtes seulement, chacune dédoublonnant la table une fois :
+        une par client, une par jour (d'où dérivent les agrégats mensuels et
+        la dernière date).
+
+        Returns:
+            dict: Mêmes agrégats que DataAnalyzer._aggregates
+        """
+        source = self._source()
+        where = self._where()
+
+        # Agrégats par client
+        clients = self._query(
+            f"SELECT client_id, COUNT(*), SUM(CAST(montant AS REAL)) FROM {source} "
+            f"{where} GROUP BY client_id"
+        )
+        index_clients = [row[0] for row in clients]
+        achats_par_client = pd.Series([row[1] for row in clients], index=index_clients, dtype=np.int64)
+        ca_par_client = pd.Series([row[2] for row in clients], index=index_clients, dtype=np.float64)
+
+        # Totaux journaliers et dernière date (avec l'heure éventuelle)
+        jours = self._query(
+            f"SELECT {self.EXPR_JOUR} AS jour, COUNT(*), SUM(CAST(montant AS REAL)), "
+            f"MAX({self.EXPR_DATE}) FROM {source} "
+            f"{where} GROUP BY {self.EXPR_JOUR} ORDER BY jour"
+        )
+        daily = pd.DataFrame(
+            {
+                'ca': [row[2] for row in jours],
+                'nb_transactions': [row[1] for row in jours]
+            },
+            index=pd.DatetimeIndex(pd.to_datetime([row[0] for row in jours]), name='date'),
+        ).astype({'ca': np.float64, 'nb_transactions': np.int64})
+        date_fin = jours[-1][3] if jours else None
+
+        # Agrégats mensuels déduits des totaux journaliers (sans nouveau parcours de la table)
+        par_mois = daily.groupby(daily.index.to_period('M'))
+
+        return {
+            'achats_par_client': achats_par_client,
+            'ca_par_client': ca_par_client,
+            'ca_mensuel': par_mois['ca'].sum(),
+            'nb_mensuel': par_mois['nb_transactions'].sum(),
+            'daily': daily,
+            'date_fin': pd.Timestamp(date_fin) if date_fin is not None else pd.NaT
+        }
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_analyzer import DataAnalyzer
+from parallel_analyzer import ParallelDataAnalyzer, _donnees_benchmark
+
+KPIS_SCALAIRES = [
+    'ca_total', 'nb_transactions', 'panier_moyen', 'nb_clients', 'freq_achat_moyenne',
+    'evolution_ca', 'taux_retention', 'concentration_ca', 'gini', 'evolution_panier',
+]
+
+
+def _transactions(client_ids='numeriques'):
+    """Transactions sur plusieurs mois avec un pic de CA et des statuts non complets"""
+    df = _donnees_benchmark(20_000, nb_clients=1_000)
+    df.loc[::13, 'statut'] = 'annule'
+    # Pic de CA sur une journée récente
+    pic = df['date'] == df['date'].max()
+    df.loc[pic, 'montant'] *= 20
+
+    if client_ids == 'chaines':
+        df['client_id'] = 'C' + df['client_id'].astype(str)
+    elif client_ids == 'melanges':
+        # 1 et "1" sont deux clients distincts pour pandas (cas des fichiers Excel)
+        df['client_id'] = df['client_id'].astype(object)
+        df.loc[::2, 'client_id'] = df.loc[::2, 'client_id'].astype(str)
+    return df
+
+
+def _assert_kpis_identiques(kpis, reference):
+    for cle in KPIS_SCALAIRES:
+        assert kpis[cle] == pytest.approx(reference[cle]), cle
+    assert kpis['date_fin'] == reference['date_fin']
+
+    assert list(kpis['ca_mensuel'].index) == list(reference['ca_mensuel'].index)
+    np.testing.assert_allclose(kpis['ca_mensuel'].values, reference['ca_mensuel'].values)
+
+    assert len(reference['anomalies']) > 0
+    pd.testing.assert_frame_equal(
+        kpis['anomalies'].reset_index(drop=True),
+        reference['anomalies'].reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+@pytest.mark.parametrize('client_ids', ['numeriques', 'chaines', 'melanges'])
+@pytest.mark.parametrize('n_workers', [1, 3])
+def test_kpis_identiques_a_data_analyzer(client_ids, n_workers):
+    df = _transactions(client_ids)
+    reference = DataAnalyzer(df).get_kpis()
+
+    kpis = ParallelDataAnalyzer(df, n_workers=n_workers).get_kpis()
+
+    _assert_kpis_identiques(kpis, reference)
+
+
+def test_moins_de_lignes_que_de_workers():
+    df = _donnees_benchmark(2)
+
+    kpis = ParallelDataAnalyzer(df, n_workers=4).get_kpis()
+
+    assert kpis['nb_transactions'] == 2
+    assert kpis['ca_total'] == pytest.approx(df['montant'].sum())
@@ -0,0 +1,107 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_analyzer import DataAnalyzer
+from sql_source import SQLDataAnalyzer
+
+KPIS_SCALAIRES = [
+    'ca_total', 'nb_transactions', 'panier_moyen', 'nb_clients', 'freq_achat_moyenne',
+    'evolution_ca', 'taux_retention', 'concentration_ca', 'gini', 'evolution_panier',
+]
+
+
+def _transactions():
+    """Transactions sur plusieurs mois, avec lignes non complètes et invalides"""
+    rng = np.random.default_rng(0)
+    n = 600
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 24 * 100, n), unit='h')
+    df = pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d %H:%M:%S'),
+        'client_id': np.char.add('C', rng.integers(0, 60, n).astype(str)).astype(object),
+        'montant': rng.gamma(3, 30, n).round(2),
+        'statut': rng.choice(['complete', 'annule', 'rembourse', 'en_attente'], n, p=[0.7, 0.1, 0.1, 0.1]),
+    })
+
+    # Valeurs manquantes
+    df.loc[::23, 'client_id'] = None
+    df.loc[::31, 'montant'] = None
+    # Statut à normaliser, montant négatif, dates hors plage
+    df.loc[::17, 'statut'] = ' Complete'
+    df.loc[5, ['montant', 'statut']] = [-50.0, 'complete']
+    df.loc[6, ['date', 'statut']] = ['2099-01-01 00:00:00', 'complete']
+    df.loc[7, ['date', 'statut']] = ['1990-06-01 00:00:00', 'complete']
+    # Montants en texte : lisible, illisible, virgule décimale
+    df['montant'] = df['montant'].astype(object)
+    df.loc[8, ['montant', 'statut']] = ['42.5', 'complete']
+    df.loc[9, ['montant', 'statut']] = ['abc', 'complete']
+    df.loc[10, ['montant', 'statut']] = ['12,5', 'complete']
+    # Doublons exacts
+    return pd.concat([df, df.iloc[[10, 11, 12]]], ignore_index=True)
+
+
+@pytest.fixture(params=['REAL', 'TEXT'])
+def db_path(tmp_path, request):
+    path = tmp_path / 'ventes.db'
+    with sqlite3.connect(path) as connection:
+        # Colonne REAL : les textes non numériques restent en TEXT ;
+        # colonne TEXT : tous les montants sont stockés en texte
+        connection.execute(
+            f"CREATE TABLE transactions (date TEXT, client_id TEXT, montant {request.param}, statut TEXT)"
+        )
+        _transactions().to_sql('transactions', connection, index=False, if_exists='append')
+    return path
+
+
+def _reference(path):
+    """KPIs calculés par DataAnalyzer sur les mêmes lignes, chargées en pandas"""
+    connection = sqlite3.connect(path)
+    try:
+        df = pd.read_sql('SELECT * FROM transactions', connection)
+    finally:
+        connection.close()
+    return DataAnalyzer(df).get_kpis()
+
+
+def test_kpis_identiques_a_data_analyzer(db_path):
+    reference = _reference(db_path)
+
+    with SQLDataAnalyzer.from_sqlite(db_path) as analyzer:
+        kpis = analyzer.get_kpis()
+
+    for cle in KPIS_SCALAIRES:
+        assert kpis[cle] == pytest.approx(reference[cle]), cle
+    assert kpis['date_fin'] == reference['date_fin']
+    assert list(kpis['ca_mensuel'].index) == list(reference['ca_mensuel'].index)
+    np.testing.assert_allclose(kpis['ca_mensuel'].values, reference['ca_mensuel'].values)
+    assert kpis['parts_top'] == pytest.approx(reference['parts_top'])
+
+
+def test_plusieurs_mois_et_lignes_ecartees(db_path):
+    with SQLDataAnalyzer.from_sqlite(db_path) as analyzer:
+        kpis = analyzer.get_kpis()
+
+    assert len(kpis['ca_mensuel']) >= 3
+    assert kpis['date_fin'] < pd.Timestamp('2099-01-01')
+    assert kpis['ca_mensuel'].index.min() >= pd.Period('2024-01', freq='M')
+
+
+def test_from_sqlite_lecture_seule_et_fermeture(db_path, monkeypatch):
+    # Chemin relatif : l'URI doit être construite à partir du chemin absolu
+    monkeypatch.chdir(db_path.parent)
+    analyzer = SQLDataAnalyzer.from_sqlite(db_path.name)
+
+    with pytest.raises(sqlite3.OperationalError):
+        analyzer.connection.execute("DELETE FROM transactions")
+
+    with analyzer:
+        pass
+    with pytest.raises(sqlite3.ProgrammingError):
+        analyzer.connection.execute("SELECT 1")
+
+
+def test_nom_de_table_invalide():
+    with pytest.raises(ValueError):
+        SQLDataAnalyzer(sqlite3.connect(':memory:'), table='transactions; DROP TABLE x')
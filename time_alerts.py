@@ -0,0 +1,172 @@
+import pandas as pd
+import numpy as np
+
+# Fenêtre glissante et seuil de z-score pour les séries journalières
+FENETRE_JOURS = 28
+SEUIL_Z_JOUR = 3.0
+
+# Fenêtre glissante et seuil de z-score pour les séries hebdomadaires
+FENETRE_SEMAINES = 8
+SEUIL_Z_SEMAINE = 2.5
+
+# Nombre minimal de jours observés pour évaluer une semaine partielle
+JOURS_MIN_SEMAINE = 4
+
+# Indicateurs suivis
+INDICATEURS = ('ca', 'nb_transactions', 'panier_moyen')
+
+
+def daily_totals(df):
+    """
+    Additionne CA et nombre de transactions par jour (jours avec ventes uniquement)
+
+    Ces totaux sont additifs : des totaux calculés sur des partitions des
+    transactions peuvent être sommés pour obtenir ceux de l'ensemble.
+
+    Args:
+        df: DataFrame avec colonnes date (datetime) et montant
+
+    Returns:
+        DataFrame: ca, nb_transactions indexés par jour
+    """
+    jours = df['date'].dt.normalize()
+    totals = df.groupby(jours)['montant'].agg(['sum', 'count'])
+    totals.columns = ['ca', 'nb_transactions']
+    return totals
+
+
+def daily_series(totals):
+    """
+    Complète les totaux journaliers (jours sans vente inclus) et ajoute le panier moyen
+
+    Args:
+        totals: DataFrame renvoyé par daily_totals
+
+    Returns:
+        DataFrame: ca, nb_transactions, panier_moyen indexés par jour
+    """
+    daily = totals[['ca', 'nb_transactions']]
+
+    if len(daily) > 0:
+        index = pd.date_range(daily.index.min(), daily.index.max(), freq='D')
+        daily = daily.reindex(index, fill_value=0)
+
+    daily = daily.astype(float)
+    daily['panier_moyen'] = daily['ca'] / daily['nb_transactions'].where(daily['nb_transactions'] > 0)
+    return daily
+
+
+def weekly_series(daily):
+    """
+    Agrège la série journalière par semaine, ramenée au nombre de jours observés
+
+    Les semaines partielles (début et fin d'historique) sont exprimées en
+    moyenne par jour observé pour rester comparables aux semaines complètes ;
+    celles qui comptent moins de JOURS_MIN_SEMAINE jours sont ignorées (NaN).
+
+    Args:
+        daily: DataFrame renvoyé par daily_series
+
+    Returns:
+        DataFrame: ca, nb_transactions (par jour observé) et panier_moyen par semaine
+    """
+    semaines = daily[['ca', 'nb_transactions']].resample('W-SUN').sum()
+    nb_jours = daily['ca'].resample('W-SUN').size()
+
+    weekly = semaines.div(nb_jours, axis=0)
+    weekly['panier_moyen'] = semaines['ca'] / semaines['nb_transactions'].where(semaines['nb_transactions'] > 0)
+    weekly.loc[nb_jours < JOURS_MIN_SEMAINE, list(INDICATEURS)] = np.nan
+    weekly['nb_jours'] = nb_jours
+    return weekly
+
+
+def rolling_zscores(values, window):
+    """
+    Calcule moyenne, écart-type glissants et z-scores en O(n) par sommes cumulées
+
+    La fenêtre couvre les `window` points précédant chaque point (le point
+    courant est exclu). Les valeurs manquantes sont ignorées ; le z-score
+    vaut NaN tant que la fenêtre est remplie à moins de moitié.
+
+    Args:
+        values: Tableau numpy de valeurs (NaN autorisés)
+        window: Taille de la fenêtre
+
+    Returns:
+        tuple: (moyenne, ecart_type, zscore) en tableaux numpy
+    """
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+
+    # Sommes cumulées préfixées d'un zéro : S[i] = somme des i premiers points
+    s1 = np.concatenate([[0.0], np.cumsum(x)])
+    s2 = np.concatenate([[0.0], np.cumsum(x * x)])
+    cnt = np.concatenate([[0], np.cumsum(valid)])
+
+    fin = np.arange(len(values))
+    debut = np.maximum(fin - window, 0)
+
+    n = (cnt[fin] - cnt[debut]).astype(float)
+    somme = s1[fin] - s1[debut]
+    somme_carres = s2[fin] - s2[debut]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        moyenne = somme / n
+        variance = (somme_carres - n * moyenne ** 2) / (n - 1)
+        ecart_type = np.sqrt(np.clip(variance, 0, None))
+        zscore = (values - moyenne) / ecart_type
+
+    # Fenêtre incomplète ou sans dispersion : pas de z-score exploitable
+    zscore[(n < window // 2) | (n < 2) | ~(ecart_type > 0)] = np.nan
+    return moyenne, ecart_type, zscore
+
+
+def _anomalies(series, window, seuil, periode):
+    """Repère les points dont le z-score dépasse le seuil pour chaque indicateur"""
+    resultats = []
+    for indicateur in INDICATEURS:
+        moyenne, _, zscore = rolling_zscores(series[indicateur].values, window)
+        mask = np.abs(np.nan_to_num(zscore)) > seuil
+        if mask.any():
+            resultats.append(pd.DataFrame({
+                'periode': periode,
+                'date': series.index[mask],
+                'indicateur': indicateur,
+                'valeur': series[indicateur].values[mask],
+                'moyenne': moyenne[mask],
+                'zscore': zscore[mask]
+            }))
+    return resultats
+
+
+def detect_anomalies(totals, fenetre_jours=FENETRE_JOURS, seuil_jour=SEUIL_Z_JOUR,
+                     fenetre_semaines=FENETRE_SEMAINES, seuil_semaine=SEUIL_Z_SEMAINE):
+    """
+    Détecte les jours et semaines anormaux sur CA, transactions et panier moyen
+
+    Args:
+        totals: Totaux journaliers renvoyés par daily_totals
+        fenetre_jours: Taille de la fenêtre glissante journalière
+        seuil_jour: Seuil de z-score journalier
+        fenetre_semaines: Taille de la fenêtre glissante hebdomadaire
+        seuil_semaine: Seuil de z-score hebdomadaire
+
+    Returns:
+        DataFrame: Une ligne par anomalie (periode, date, indicateur, valeur, moyenne, zscore)
+    """
+    colonnes = ['periode', 'date', 'indicateur', 'valeur', 'moyenne', 'zscore']
+    if len(totals) == 0:
+        return pd.DataFrame(columns=colonnes)
+
+    daily = daily_series(totals)
+    weekly = weekly_series(daily)
+
+    resultats = (
+        _anomalies(daily, fenetre_jours, seuil_jour, 'jour')
+        + _anomalies(weekly, fenetre_semaines, seuil_semaine, 'semaine')
+    )
+    if not resultats:
+        return pd.DataFrame(columns=colonnes)
+
+    return pd.concat(resultats, ignore_index=True).sort_values('date', ignore_index=True)